@@ -14,37 +14,48 @@
 
 """Unit tests for canonical_xxx fields in LlmAgent."""
 
+import logging
+from types import MappingProxyType
 from typing import Any
 from typing import Optional
+from typing import Union
+from unittest.mock import MagicMock
 
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import InstructionProvider
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.agents.loop_agent import LoopAgent
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.registry import LLMRegistry
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.adk.agents.content_config import ContentConfig, SummarizationConfig
 from google.genai import types
-from pydantic import BaseModel, ValidationError
+from pydantic import create_model
+from pydantic import ValidationError
 import pytest
 
+_EMPTY_SCHEMA = create_model('Schema')
+
 
 def _create_readonly_context(
-    agent: LlmAgent, state: Optional[dict[str, Any]] = None
+    state: Optional[dict[str, Any]] = None,
 ) -> ReadonlyContext:
-  session_service = InMemorySessionService()
-  session = session_service.create_session(
-      app_name='test_app', user_id='test_user', state=state
-  )
-  invocation_context = InvocationContext(
-      invocation_id='test_id',
-      agent=agent,
-      session=session,
-      session_service=session_service,
-  )
-  return ReadonlyContext(invocation_context)
+  """Returns a ReadonlyContext mock exposing only the given session state.
+
+  The instruction providers under test only read ctx.state, so there is no
+  need to build a session and invocation context.
+  """
+  ctx = MagicMock(spec=ReadonlyContext)
+  ctx.state = MappingProxyType(state or {})
+  return ctx
+
+
+def _instruction_provider(ctx: ReadonlyContext) -> str:
+  return f'instruction: {ctx.state["state_var"]}'
+
+
+def _global_instruction_provider(ctx: ReadonlyContext) -> str:
+  return f'global instruction: {ctx.state["state_var"]}'
 
 
 def test_canonical_model_empty():
@@ -76,69 +87,72 @@ def test_canonical_model_inherit():
   assert sub_agent.canonical_model == parent_agent.canonical_model
 
 
-def test_canonical_instruction_str():
-  agent = LlmAgent(name='test_agent', instruction='instruction')
-  ctx = _create_readonly_context(agent)
-
-  assert agent.canonical_instruction(ctx) == 'instruction'
-
-
-def test_canonical_instruction():
-  def _instruction_provider(ctx: ReadonlyContext) -> str:
-    return f'instruction: {ctx.state["state_var"]}'
-
-  agent = LlmAgent(name='test_agent', instruction=_instruction_provider)
-  ctx = _create_readonly_context(agent, state={'state_var': 'state_value'})
-
-  assert agent.canonical_instruction(ctx) == 'instruction: state_value'
-
-
-def test_canonical_global_instruction_str():
-  agent = LlmAgent(name='test_agent', global_instruction='global instruction')
-  ctx = _create_readonly_context(agent)
+@pytest.mark.parametrize(
+    'instruction, state, expected',
+    [
+        pytest.param('instruction', None, 'instruction', id='str'),
+        pytest.param(
+            _instruction_provider,
+            {'state_var': 'state_value'},
+            'instruction: state_value',
+            id='provider',
+        ),
+    ],
+)
+def test_canonical_instruction(
+    instruction: Union[str, InstructionProvider],
+    state: Optional[dict[str, Any]],
+    expected: str,
+):
+  agent = LlmAgent(name='test_agent', instruction=instruction)
+  ctx = _create_readonly_context(state)
+
+  assert agent.canonical_instruction(ctx) == expected
+
+
+@pytest.mark.parametrize(
+    'global_instruction, state, expected',
+    [
+        pytest.param(
+            'global instruction', None, 'global instruction', id='str'
+        ),
+        pytest.param(
+            _global_instruction_provider,
+            {'state_var': 'state_value'},
+            'global instruction: state_value',
+            id='provider',
+        ),
+    ],
+)
+def test_canonical_global_instruction(
+    global_instruction: Union[str, InstructionProvider],
+    state: Optional[dict[str, Any]],
+    expected: str,
+):
+  agent = LlmAgent(name='test_agent', global_instruction=global_instruction)
+  ctx = _create_readonly_context(state)
 
-  assert agent.canonical_global_instruction(ctx) == 'global instruction'
+  assert agent.canonical_global_instruction(ctx) == expected
 
 
-def test_canonical_global_instruction():
-  def _global_instruction_provider(ctx: ReadonlyContext) -> str:
-    return f'global instruction: {ctx.state["state_var"]}'
+def test_output_schema_will_disable_transfer(caplog: pytest.LogCaptureFixture):
+  caplog.set_level(logging.WARNING, logger='google.adk')
 
   agent = LlmAgent(
-      name='test_agent', global_instruction=_global_instruction_provider
+      name='test_agent',
+      output_schema=_EMPTY_SCHEMA,
   )
-  ctx = _create_readonly_context(agent, state={'state_var': 'state_value'})
 
+  # Transfer is automatically disabled
+  assert agent.disallow_transfer_to_parent
+  assert agent.disallow_transfer_to_peers
   assert (
-      agent.canonical_global_instruction(ctx)
-      == 'global instruction: state_value'
+      'output_schema cannot co-exist with agent transfer configurations.'
+      in caplog.text
   )
 
 
-def test_output_schema_will_disable_transfer(caplog: pytest.LogCaptureFixture):
-  with caplog.at_level('WARNING'):
-
-    class Schema(BaseModel):
-      pass
-
-    agent = LlmAgent(
-        name='test_agent',
-        output_schema=Schema,
-    )
-
-    # Transfer is automatically disabled
-    assert agent.disallow_transfer_to_parent
-    assert agent.disallow_transfer_to_peers
-    assert (
-        'output_schema cannot co-exist with agent transfer configurations.'
-        in caplog.text
-    )
-
-
 def test_output_schema_with_sub_agents_will_throw():
-  class Schema(BaseModel):
-    pass
-
   sub_agent = LlmAgent(
       name='sub_agent',
   )
@@ -146,22 +160,19 @@ def test_output_schema_with_sub_agents_will_throw():
   with pytest.raises(ValueError):
     _ = LlmAgent(
         name='test_agent',
-        output_schema=Schema,
+        output_schema=_EMPTY_SCHEMA,
         sub_agents=[sub_agent],
     )
 
 
 def test_output_schema_with_tools_will_throw():
-  class Schema(BaseModel):
-    pass
-
   def _a_tool():
     pass
 
   with pytest.raises(ValueError):
     _ = LlmAgent(
         name='test_agent',
-        output_schema=Schema,
+        output_schema=_EMPTY_SCHEMA,
         tools=[_a_tool],
     )
 
@@ -181,46 +192,27 @@ def test_before_model_callback():
   assert agent.before_model_callback is not None
 
 
-def test_validate_generate_content_config_thinking_config_throw():
-  with pytest.raises(ValueError):
-    _ = LlmAgent(
-        name='test_agent',
-        generate_content_config=types.GenerateContentConfig(
-            thinking_config=types.ThinkingConfig()
+@pytest.mark.parametrize(
+    'gcc_kwargs',
+    [
+        pytest.param(
+            {'thinking_config': types.ThinkingConfig()}, id='thinking_config'
         ),
-    )
-
-
-def test_validate_generate_content_config_tools_throw():
-  with pytest.raises(ValueError):
-    _ = LlmAgent(
-        name='test_agent',
-        generate_content_config=types.GenerateContentConfig(
-            tools=[types.Tool(function_declarations=[])]
+        pytest.param(
+            {'tools': [types.Tool(function_declarations=[])]}, id='tools'
         ),
-    )
-
-
-def test_validate_generate_content_config_system_instruction_throw():
-  with pytest.raises(ValueError):
-    _ = LlmAgent(
-        name='test_agent',
-        generate_content_config=types.GenerateContentConfig(
-            system_instruction='system instruction'
+        pytest.param(
+            {'system_instruction': 'system instruction'},
+            id='system_instruction',
         ),
-    )
-
-
-def test_validate_generate_content_config_response_schema_throw():
-  class Schema(BaseModel):
-    pass
-
+        pytest.param({'response_schema': _EMPTY_SCHEMA}, id='response_schema'),
+    ],
+)
+def test_validate_generate_content_config_throw(gcc_kwargs: dict[str, Any]):
   with pytest.raises(ValueError):
     _ = LlmAgent(
         name='test_agent',
-        generate_content_config=types.GenerateContentConfig(
-            response_schema=Schema
-        ),
+        generate_content_config=types.GenerateContentConfig(**gcc_kwargs),
     )
 
 
@@ -233,102 +225,137 @@ def test_allow_transfer_by_default():
 
 
 # Tests for canonical_content_config
-def test_canonical_content_config_default_string():
-    agent = LlmAgent(name='test_agent', include_contents='default')
-    config = agent.canonical_content_config
-    assert isinstance(config, ContentConfig)
-    assert config.enabled is True
-
-
-def test_canonical_content_config_none_string():
-    agent = LlmAgent(name='test_agent', include_contents='none')
-    config = agent.canonical_content_config
-    assert isinstance(config, ContentConfig)
-    assert config.enabled is False
+@pytest.mark.parametrize(
+    'include_contents, expected_enabled',
+    [
+        pytest.param('default', True, id='default'),
+        pytest.param('none', False, id='none'),
+    ],
+)
+def test_canonical_content_config_string(
+    include_contents: str, expected_enabled: bool
+):
+  agent = LlmAgent(name='test_agent', include_contents=include_contents)
+  config = agent.canonical_content_config
+
+  assert isinstance(config, ContentConfig)
+  assert config.enabled is expected_enabled
 
 
 def test_canonical_content_config_object():
-    custom_config = ContentConfig(enabled=True, max_events=5)
-    agent = LlmAgent(name='test_agent', include_contents=custom_config)
-    config = agent.canonical_content_config
-    assert config is custom_config  # Should be the same object
-    assert config.max_events == 5
+  custom_config = ContentConfig(enabled=True, max_events=5)
+  agent = LlmAgent(name='test_agent', include_contents=custom_config)
+  config = agent.canonical_content_config
 
-
-# Tests for ContentConfig and SummarizationConfig models
-def test_summarization_config_defaults():
-    config = SummarizationConfig()
-    assert config.model is None
-    assert config.instruction is None
-    assert config.max_tokens is None
+  assert config is custom_config  # Should be the same object
+  assert config.max_events == 5
 
 
-def test_summarization_config_custom():
-    config = SummarizationConfig(model="gemini-2.0-flash", instruction="Summarize.", max_tokens=123)
-    assert config.model == "gemini-2.0-flash"
-    assert config.instruction == "Summarize."
-    assert config.max_tokens == 123
+# Tests for ContentConfig and SummarizationConfig models
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        pytest.param({}, id='defaults'),
+        pytest.param(
+            {
+                'model': 'gemini-2.0-flash',
+                'instruction': 'Summarize.',
+                'max_tokens': 123,
+            },
+            id='custom',
+        ),
+    ],
+)
+def test_summarization_config(kwargs: dict[str, Any]):
+  config = SummarizationConfig(**kwargs)
+
+  assert config.model_dump() == {
+      'model': None,
+      'instruction': None,
+      'max_tokens': None,
+      **kwargs,
+  }
+
+
+_DEFAULT_CONTENT_DICT = {
+    'enabled': True,
+    'include_authors': None,
+    'exclude_authors': None,
+    'max_events': None,
+    'summarize': False,
+    'summary_template': 'Previous conversation summary: {summary}',
+    'summarization_config': None,
+    'summarization_window': None,
+    'always_include_last_n': None,
+    'context_from_state': None,
+    'state_template': 'Session Information:\n{context}',
+    'convert_foreign_events': True,
+}
 
 
 def test_content_config_defaults():
-    config = ContentConfig()
-    assert config.enabled is True
-    assert config.include_authors is None
-    assert config.exclude_authors is None
-    assert config.max_events is None
-    assert config.summarize is False
-    assert config.summary_template == "Previous conversation summary: {summary}"
-    assert config.summarization_config is None
-    assert config.summarization_window is None
-    assert config.always_include_last_n is None
-    assert config.context_from_state is None
-    assert config.state_template == "Session Information:\n{context}"
+  assert ContentConfig().model_dump() == _DEFAULT_CONTENT_DICT
 
 
 def test_content_config_custom():
-    summ_cfg = SummarizationConfig(model="gemini-2.0-flash", instruction="Summarize.", max_tokens=50)
-    config = ContentConfig(
-        enabled=False,
-        include_authors=["user", "agent"],
-        max_events=10,
-        summarize=True,
-        summary_template="Summary: {summary}",
-        summarization_config=summ_cfg,
-        summarization_window=5,
-        always_include_last_n=2,
-        context_from_state=["foo", "bar"],
-        state_template="CTX: {context}"
-    )
-    assert config.enabled is False
-    assert config.include_authors == ["user", "agent"]
-    assert config.exclude_authors is None
-    assert config.max_events == 10
-    assert config.summarize is True
-    assert config.summary_template == "Summary: {summary}"
-    assert config.summarization_config == summ_cfg
-    assert config.summarization_window == 5
-    assert config.always_include_last_n == 2
-    assert config.context_from_state == ["foo", "bar"]
-    assert config.state_template == "CTX: {context}"
+  summ_cfg = SummarizationConfig(
+      model='gemini-2.0-flash', instruction='Summarize.', max_tokens=50
+  )
+  custom_kwargs = {
+      'enabled': False,
+      'include_authors': ['user', 'agent'],
+      'max_events': 10,
+      'summarize': True,
+      'summary_template': 'Summary: {summary}',
+      'summarization_config': summ_cfg,
+      'summarization_window': 5,
+      'always_include_last_n': 2,
+      'context_from_state': ['foo', 'bar'],
+      'state_template': 'CTX: {context}',
+  }
+  config = ContentConfig(**custom_kwargs)
+
+  assert config.exclude_authors is None
+  for name, value in custom_kwargs.items():
+    assert getattr(config, name) == value
+
+
+_CONTENT_CONFIG_DATA = {
+    'enabled': False,
+    'include_authors': ['user'],
+    'summarize': True,
+    'summarization_config': {
+        'model': 'gemini-2.0-flash',
+        'instruction': 'Summarize briefly',
+        'max_tokens': 100,
+    },
+}
+
+
+def test_content_config_from_dict():
+  config = ContentConfig.model_validate(_CONTENT_CONFIG_DATA)
+
+  assert config.enabled is False
+  assert config.include_authors == ['user']
+  assert config.summarize is True
+  assert config.summarization_config.model == 'gemini-2.0-flash'
+
+
+_CONTENT_CONFIG_JSON = (
+    '{"enabled": false, "include_authors": ["user"], "summarize": true,'
+    ' "summarization_config": {"model": "gemini-2.0-flash",'
+    ' "instruction": "Summarize briefly", "max_tokens": 100}}'
+)
 
 
 def test_content_config_serialization():
-    data = {
-        "enabled": False,
-        "include_authors": ["user"],
-        "summarize": True,
-        "summarization_config": {"model": "gemini-2.0-flash", "instruction": "Summarize briefly", "max_tokens": 100}
-    }
-    config = ContentConfig(**data)
-    dumped = config.model_dump()
-    assert dumped["enabled"] is False
-    assert dumped["include_authors"] == ["user"]
-    assert dumped["summarize"] is True
-    assert dumped["summarization_config"]["model"] == "gemini-2.0-flash"
+  config = ContentConfig.model_validate_json(_CONTENT_CONFIG_JSON)
+
+  assert ContentConfig.model_validate_json(config.model_dump_json()) == config
 
 
 def test_content_config_type_validation():
-    with pytest.raises(ValidationError):
-        ContentConfig(enabled="not_a_valid_boolean")  # This should now raise ValidationError
-    with pytest.raises(ValidationError):
-        SummarizationConfig(max_tokens="thousand")  # This should correctly raise ValidationError
+  with pytest.raises(ValidationError):
+    ContentConfig(enabled='not_a_valid_boolean')
+  with pytest.raises(ValidationError):
+    SummarizationConfig(max_tokens='thousand')